@@ -5,23 +5,30 @@ A beautifully designed exam wishes board with modern UI/UX and cloud storage
 """
 
 import os
+import re
 import json
-import uuid
+import hmac
+import hashlib
+import mmap
+import queue
+import secrets
+import threading
 from pathlib import Path
 from io import BytesIO
-from datetime import datetime
-from textwrap import wrap
-import logging
+from time import gmtime, monotonic, strftime
+from typing import NamedTuple
+from itertools import islice, zip_longest
+from concurrent.futures import Future, ThreadPoolExecutor
+from xml.sax.saxutils import escape as xml_escape
 
 import streamlit as st
-import pandas as pd
+import streamlit.components.v1 as components
+from tenacity import retry, retry_if_exception, stop_after_attempt, stop_before_delay, wait_exponential, wait_random
 from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
 from reportlab.lib import colors
-import base64
 
 # Google Sheets integration
 try:
@@ -32,12 +39,55 @@ try:
 except ImportError:
     GOOGLE_SHEETS_AVAILABLE = False
 
+# Fast JSON encoding for the local fallback store
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # ---------- CONFIG & THEME ----------
-DATA_FILE = Path("messages.json")
+# Local fallback store: append-only JSONL log (one message or tombstone per line)
+DATA_FILE = Path("messages.jsonl")
+LEGACY_DATA_FILE = Path("messages.json")
 ADMIN_SECRET_KEY_NAME = "ADMIN_KEY"
 
 # Google Sheets configuration
 GOOGLE_SHEET_NAME = "ExamWishes"
+SHEET_HEADERS = ["ID", "Name", "Recipient", "Message", "Tone", "Timestamp"]
+MESSAGE_FIELDS = ("id", "name", "recipient", "message", "tone", "timestamp")
+
+# Message tones offered in the compose form, in display order
+TONES = ("inspirational", "encouraging", "funny", "calm", "formal", "custom")
+TONE_INDEX = {tone: i for i, tone in enumerate(TONES)}
+
+# Message cards rendered per page in the view tab
+MESSAGES_PER_PAGE = 20
+
+# Escaped card markup kept per message ID before the cache starts over
+CARD_CACHE_LIMIT = 2000
+
+# Most recent messages listed in the admin management section
+ADMIN_PREVIEW_COUNT = 5
+
+# Attempts for a Sheets call that hits a quota (429) or transient server error
+SHEETS_RETRY_ATTEMPTS = 5
+SHEETS_RETRY_STATUS = (429, 500, 502, 503)
+# Writes retry only quota rejections; a 5xx may already have been applied
+SHEETS_WRITE_RETRY_STATUS = (429,)
+SHEETS_RETRY_AFTER_CAP = 30
+# Total time a rerun may spend retrying before it falls back
+SHEETS_RERUN_RETRY_SECONDS = 10
+# Seconds any single Sheets HTTP request may take
+SHEETS_HTTP_TIMEOUT = 10
+# Seconds to keep using the local fallback after Sheets could not be reached
+SHEETS_RECONNECT_COOLDOWN = 60
+
+# Most queued message appends sent to Google Sheets in one request
+SHEETS_APPEND_BATCH = 100
+
+# Messages laid out per PDF batch; bounds how many flowables exist at once
+PDF_BATCH_SIZE = 50
 
 # Modern color palette
 COLORS = {
@@ -68,17 +118,32 @@ EMOJI_CATEGORIES = {
     "💝 Support": ["❤️", "🤍", "💙", "🙌", "👏", "🤞", "🍀", "☘️", "🌈", "🌿"],
     "😊 Emotions": ["😊", "😄", "🤩", "🥰", "😎", "🤗", "🎊", "🎈", "💫", "⚡"]
 }
+EMOJI_CATEGORY_NAMES = tuple(EMOJI_CATEGORIES)
+EMOJI_CATEGORY_INDEX = {name: i for i, name in enumerate(EMOJI_CATEGORY_NAMES)}
 
 # ---------- DYNAMIC CONFIGURATION ----------
+class RecipientText(NamedTuple):
+    """Recipient-derived strings shown in the page header and stored on messages"""
+    title: str
+    subtitle: str
+    display_text: str
+    recipient_string: str
+
+@st.cache_resource(show_spinner=False)
 def get_recipient_names():
-    """Get recipient names from secrets.toml"""
-    if 'RECIPIENTS' in st.secrets:
-        recipients = st.secrets['RECIPIENTS']
-        if isinstance(recipients, list):
-            return recipients
-        elif isinstance(recipients, str):
-            return [name.strip() for name in recipients.split(',') if name.strip()]
-    return []
+    """Get recipient names from secrets.toml (parsed once per process)"""
+    recipients = st.secrets.get('RECIPIENTS')
+    if isinstance(recipients, list):
+        return tuple(recipients)
+    elif isinstance(recipients, str):
+        return tuple(name.strip() for name in recipients.split(',') if name.strip())
+    return ()
+
+def format_recipient_names(recipients):
+    """Join names as "A", "A & B" or "A, B & C" for titles and storage"""
+    if len(recipients) <= 2:
+        return " & ".join(recipients)
+    return ", ".join(recipients[:-1]) + f" & {recipients[-1]}"
 
 def get_app_title():
     """Generate dynamic app title based on recipients"""
@@ -86,13 +151,7 @@ def get_app_title():
     
     if not recipients:
         return "Good Luck Board"
-    elif len(recipients) == 1:
-        return f"Good Luck {recipients[0]}!"
-    elif len(recipients) == 2:
-        return f"Good Luck {recipients[0]} & {recipients[1]}!"
-    else:
-        names = ", ".join(recipients[:-1]) + f" & {recipients[-1]}"
-        return f"Good Luck {names}!"
+    return f"Good Luck {format_recipient_names(recipients)}!"
 
 def get_app_subtitle():
     """Generate dynamic subtitle based on recipients"""
@@ -100,13 +159,7 @@ def get_app_subtitle():
     
     if not recipients:
         return "Send warm exam wishes! ✨"
-    elif len(recipients) == 1:
-        return f"Send warm wishes to {recipients[0]} for their exams! ✨"
-    elif len(recipients) == 2:
-        return f"Send warm wishes to {recipients[0]} & {recipients[1]} for their exams! ✨"
-    else:
-        names = ", ".join(recipients[:-1]) + f" & {recipients[-1]}"
-        return f"Send warm wishes to {names} for their exams! ✨"
+    return f"Send warm wishes to {format_recipient_names(recipients)} for their exams! ✨"
 
 def get_recipient_display_text():
     """Generate display text for the featured recipients section"""
@@ -114,12 +167,7 @@ def get_recipient_display_text():
     
     if not recipients:
         return "Wishing Best of Luck To All Exam Takers!"
-    elif len(recipients) == 1:
-        return "Wishing Best of Luck To:"
-    elif len(recipients) == 2:
-        return "Wishing Best of Luck To:"
-    else:
-        return "Wishing Best of Luck To:"
+    return "Wishing Best of Luck To:"
 
 def get_recipient_string():
     """Get the recipient string for message storage"""
@@ -127,16 +175,22 @@ def get_recipient_string():
     
     if not recipients:
         return "Everyone"
-    elif len(recipients) == 1:
-        return recipients[0]
-    elif len(recipients) == 2:
-        return f"{recipients[0]} & {recipients[1]}"
-    else:
-        return ", ".join(recipients[:-1]) + f" & {recipients[-1]}"
+    return format_recipient_names(recipients)
+
+@st.cache_resource(show_spinner=False)
+def get_recipient_text():
+    """Build all recipient-derived strings once per process"""
+    return RecipientText(
+        title=get_app_title(),
+        subtitle=get_app_subtitle(),
+        display_text=get_recipient_display_text(),
+        recipient_string=get_recipient_string()
+    )
 
 # Initialize dynamic titles
-APP_TITLE = get_app_title()
-APP_SUBTITLE = get_app_subtitle()
+RECIPIENT_TEXT = get_recipient_text()
+APP_TITLE = RECIPIENT_TEXT.title
+APP_SUBTITLE = RECIPIENT_TEXT.subtitle
 
 # ---------- STORAGE UTILITIES ----------
 def init_google_sheets():
@@ -145,10 +199,11 @@ def init_google_sheets():
         return None
     
     try:
-        if 'GOOGLE_CREDENTIALS' not in st.secrets:
+        credentials = st.secrets.get('GOOGLE_CREDENTIALS')
+        if not credentials:
             return None
         
-        credentials_dict = dict(st.secrets['GOOGLE_CREDENTIALS'])
+        credentials_dict = dict(credentials)
         
         required_fields = ['type', 'project_id', 'private_key_id', 'private_key', 'client_email']
         missing_fields = [field for field in required_fields if field not in credentials_dict or not credentials_dict[field]]
@@ -164,6 +219,7 @@ def init_google_sheets():
         try:
             creds = Credentials.from_service_account_info(credentials_dict, scopes=scopes)
             client = gspread.authorize(creds)
+            client.set_timeout(SHEETS_HTTP_TIMEOUT)
         except (GoogleAuthError, Exception):
             return None
         
@@ -172,17 +228,20 @@ def init_google_sheets():
         except gspread.SpreadsheetNotFound:
             try:
                 sheet = client.create(GOOGLE_SHEET_NAME)
-                sheet.share(None, perm_type='anyone', role='writer')
             except Exception:
                 return None
+            if st.secrets.get('AUTO_SHARE_SHEET', False):
+                # Drive API call with its own quota; don't block startup on it
+                get_write_executor().submit(sheet.share, None, perm_type='anyone', role='writer')
         except Exception:
             return None
         
         worksheet = sheet.sheet1
         
         try:
-            if not worksheet.get_all_values():
-                worksheet.append_row(["ID", "Name", "Recipient", "Message", "Tone", "Timestamp"])
+            # A single-cell read is enough to tell a brand-new sheet apart
+            if not worksheet.acell('A1').value:
+                worksheet.append_row(SHEET_HEADERS)
         except Exception:
             return None
         
@@ -191,120 +250,484 @@ def init_google_sheets():
     except Exception:
         return None
 
-def read_messages():
-    """Read messages from Google Sheets or fall back to local JSON"""
-    worksheet = st.session_state.get('google_worksheet')
+def _sheets_error_status(exc):
+    if GOOGLE_SHEETS_AVAILABLE and isinstance(exc, gspread.exceptions.APIError):
+        return exc.code
+    return None
+
+# Built from parts whose arguments are the same across tenacity releases
+_sheets_backoff = wait_exponential(multiplier=0.5, max=8) + wait_random(0, 1)
+
+def _sheets_wait(retry_state):
+    """Back off exponentially, waiting at least as long as a 429's Retry-After asks"""
+    delay = _sheets_backoff(retry_state)
+    response = getattr(retry_state.outcome.exception(), "response", None)
+    try:
+        retry_after = float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return delay
+    return max(delay, min(retry_after, SHEETS_RETRY_AFTER_CAP))
+
+def _sheets_retry(statuses, max_seconds=None):
+    """Retry policy for Sheets calls that fail with one of the given HTTP statuses"""
+    stop = stop_after_attempt(SHEETS_RETRY_ATTEMPTS)
+    if max_seconds is not None:
+        stop = stop | stop_before_delay(max_seconds)
+    return retry(
+        retry=retry_if_exception(lambda exc: _sheets_error_status(exc) in statuses),
+        wait=_sheets_wait,
+        stop=stop,
+        reraise=True
+    )
+
+@_sheets_retry(SHEETS_RETRY_STATUS, SHEETS_RERUN_RETRY_SECONDS)
+def call_sheets(method, *args, **kwargs):
+    """Call a read-only worksheet method, backing off and retrying on quota and transient errors"""
+    return method(*args, **kwargs)
+
+@_sheets_retry(SHEETS_WRITE_RETRY_STATUS, SHEETS_RERUN_RETRY_SECONDS)
+def call_sheets_write(method, *args, **kwargs):
+    """Call a mutating worksheet method, retrying only quota rejections that were never applied"""
+    return method(*args, **kwargs)
+
+@_sheets_retry(SHEETS_WRITE_RETRY_STATUS)
+def call_sheets_write_background(method, *args, **kwargs):
+    """call_sheets_write for the writer thread, which no rerun waits on, so long Retry-After waits are fine"""
+    return method(*args, **kwargs)
+
+def sheets_configured():
+    """Whether Google Sheets credentials are set up for this app"""
+    try:
+        return GOOGLE_SHEETS_AVAILABLE and bool(st.secrets.get('GOOGLE_CREDENTIALS'))
+    except Exception:
+        return False
+
+@st.cache_resource(show_spinner=False)
+def _connect_worksheet():
+    """Connect to the worksheet once per process; returns (worksheet, time of a failed attempt)"""
+    worksheet = init_google_sheets()
+    if worksheet is None and sheets_configured():
+        return None, monotonic()
+    return worksheet, None
+
+def get_worksheet():
+    """Get the Google Sheets worksheet shared across all sessions"""
+    worksheet, failed_at = _connect_worksheet()
+    if failed_at is not None and monotonic() - failed_at >= SHEETS_RECONNECT_COOLDOWN:
+        # Reconnect at most once per cooldown instead of on every call during an outage
+        _connect_worksheet.clear()
+        worksheet, _ = _connect_worksheet()
+    return worksheet
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_messages(version):
+    """Fetch messages from Google Sheets or local JSON, cached per storage version"""
+    worksheet = get_worksheet()
     if worksheet:
-        try:
-            records = worksheet.get_all_records()
-            messages = []
-            for record in records:
-                if record.get("ID") and record.get("ID") != "ID" and record.get("ID").strip():
-                    messages.append({
-                        "id": record.get("ID", ""),
-                        "name": record.get("Name", "Anonymous"),
-                        "recipient": record.get("Recipient", "Anyone"),
-                        "message": record.get("Message", ""),
-                        "tone": record.get("Tone", ""),
-                        "timestamp": record.get("Timestamp", "")
-                    })
-            return messages
-        except Exception:
-            pass
+        # A failed read raises, which st.cache_data does not cache; read_messages falls back
+        rows = call_sheets(worksheet.get, "A2:F", value_render_option="UNFORMATTED_VALUE")
+        # The Sheets API trims trailing empty cells; zip_longest pads them back
+        return [
+            dict(zip_longest(MESSAGE_FIELDS, row, fillvalue=""))
+            for row in rows
+            if row and str(row[0]).strip()
+        ]
     
-    if not DATA_FILE.exists():
-        return []
+    return read_local_messages()
+
+@st.cache_resource(show_spinner=False)
+def _local_store_lock():
+    """Process-wide lock serialising access to the local store across concurrent reruns"""
+    return threading.RLock()
+
+@st.cache_resource(show_spinner=False)
+def _local_store():
+    """Process-wide in-memory index of the local JSONL message log"""
+    return {"mtime": None, "messages": {}, "lines": 0, "tombstones": 0}
+
+def read_local_messages():
+    """Read messages from the in-memory local store, replaying the log only after it changes"""
+    store = _local_store()
+    with _local_store_lock():
+        try:
+            mtime = DATA_FILE.stat().st_mtime_ns
+        except OSError:
+            if LEGACY_DATA_FILE.exists() and not store["messages"]:
+                _migrate_legacy_file()
+            return list(store["messages"].values())
+        if mtime != store["mtime"]:
+            store["messages"], store["lines"], store["tombstones"] = _parse_local_file()
+            store["mtime"] = mtime
+        return list(store["messages"].values())
+
+def _json_loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _parse_local_file():
+    """Replay the JSONL log into an {id: message} dict plus line and tombstone counts"""
+    messages = {}
+    lines = tombstones = 0
     try:
-        with DATA_FILE.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        # Scan straight from the page cache instead of copying the file into memory first
+        with DATA_FILE.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                if not line.strip():
+                    continue
+                try:
+                    record = _json_loads(line)
+                except ValueError:
+                    # A crash mid-append can leave a torn last line; skip it
+                    continue
+                lines += 1
+                if "_tombstone" in record:
+                    messages.pop(record["_tombstone"], None)
+                    tombstones += 1
+                else:
+                    messages[record.get("id") or f"_line{lines}"] = record
     except Exception:
-        return []
+        pass
+    return messages, lines, tombstones
 
-def write_messages(messages):
-    """Write messages to Google Sheets or fall back to local JSON"""
-    worksheet = st.session_state.get('google_worksheet')
-    if worksheet:
+def _migrate_legacy_file():
+    """Convert the old single-array messages.json into the JSONL log"""
+    try:
+        with LEGACY_DATA_FILE.open("rb") as f:
+            legacy = _json_loads(f.read())
+    except Exception:
+        return
+    if isinstance(legacy, list):
+        write_local_messages(legacy)
+
+def _encode_line(record):
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+def _append_log(records):
+    """Append records to the JSONL log without touching earlier lines"""
+    store = _local_store()
+    try:
+        with DATA_FILE.open("a+b") as f:
+            data = b"".join(_encode_line(r) for r in records)
+            end = f.seek(0, os.SEEK_END)
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    # Finish a torn last line first, or the new records would be glued onto it and lost
+                    data = b"\n" + data
+            f.write(data)
+        store["lines"] += len(records)
+        store["mtime"] = DATA_FILE.stat().st_mtime_ns
+    except Exception:
+        pass
+
+def write_local_messages(messages):
+    """Replace the local store and rewrite the JSONL log compacted"""
+    store = _local_store()
+    with _local_store_lock():
+        store["messages"] = {m.get("id") or f"_line{i}": m for i, m in enumerate(messages)}
+        store["lines"] = len(messages)
+        store["tombstones"] = 0
+        tmp_file = DATA_FILE.with_suffix(".jsonl.tmp")
         try:
-            worksheet.clear()
-            worksheet.append_row(["ID", "Name", "Recipient", "Message", "Tone", "Timestamp"])
-            
-            for msg in messages:
-                worksheet.append_row([
-                    msg.get("id", ""),
-                    msg.get("name", "Anonymous"),
-                    msg.get("recipient", "Anyone"),
-                    msg.get("message", ""),
-                    msg.get("tone", ""),
-                    msg.get("timestamp", "")
-                ])
+            with tmp_file.open("wb") as f:
+                f.write(b"".join(_encode_line(m) for m in messages))
+                f.flush()
+                # Make the bytes durable before the rename can expose them
+                os.fsync(f.fileno())
+            # Swap in the complete file so a crash never leaves a half-written log
+            os.replace(tmp_file, DATA_FILE)
+            store["mtime"] = DATA_FILE.stat().st_mtime_ns
+        except Exception:
+            tmp_file.unlink(missing_ok=True)
+
+def append_local_message(entry):
+    """Append a single message to the local log in O(1)"""
+    with _local_store_lock():
+        read_local_messages()
+        _local_store()["messages"][entry.get("id")] = entry
+        _append_log([entry])
+
+def delete_local_messages(msg_ids):
+    """Tombstone messages in the local log, compacting once tombstones pass 25%"""
+    with _local_store_lock():
+        read_local_messages()
+        store = _local_store()
+        removed = [msg_id for msg_id in msg_ids if store["messages"].pop(msg_id, None) is not None]
+        if not removed:
             return
+        _append_log([{"_tombstone": msg_id} for msg_id in removed])
+        store["tombstones"] += len(removed)
+        if store["tombstones"] * 4 > store["lines"]:
+            write_local_messages(list(store["messages"].values()))
+
+def read_messages():
+    """Read messages from the session mirror, fetching them on first use"""
+    sync_pending_writes()
+    mirror = st.session_state.get('messages_mirror')
+    if mirror is None:
+        try:
+            mirror = _fetch_messages(st.session_state.get('msgs_version', 0))
         except Exception:
-            pass
+            # Show the local store for this run only; the next read asks Sheets again
+            return read_local_messages()
+        pending = st.session_state.get('pending_messages')
+        if pending:
+            # Our own queued appends are not in storage yet; keep showing them
+            stored_ids = {m.get("id") for m in mirror}
+            mirror = mirror + [m for m in pending if m.get("id") not in stored_ids]
+        st.session_state.messages_mirror = mirror
+    return mirror
+
+def invalidate_messages_cache():
+    """Force the next storage fetch, in any session, to hit storage again"""
+    st.session_state.msgs_version = st.session_state.get('msgs_version', 0) + 1
+    _fetch_messages.clear()
+
+def refresh_messages():
+    """Drop this session's mirror, running totals and cached cards so the next read refetches and re-renders"""
+    st.session_state.pop('messages_mirror', None)
+    st.session_state.pop('stats', None)
+    _card_html_cache().clear()
+    invalidate_messages_cache()
+
+def get_message_stats():
+    """Get admin statistics, scanning messages only when no running totals exist"""
+    stats = st.session_state.get('stats')
+    if stats is None:
+        messages = read_messages()
+        # Reuse the cached per-sender grouping the view tab builds from the same list
+        senders, _ = _bucket_messages(messages_fingerprint(messages), messages)
+        stats = {"total": len(messages), "senders": set(senders)}
+        # Totals of a local fallback board are not kept, like the board itself
+        if 'messages_mirror' in st.session_state:
+            st.session_state.stats = stats
+    return stats
+
+def update_message_stats(entry):
+    """Fold a newly appended message into the running statistics"""
+    stats = st.session_state.get('stats')
+    if stats is not None:
+        stats["total"] += 1
+        stats["senders"].add(entry.get("name", "Anonymous"))
+
+def messages_fingerprint(messages):
+    """Content identity for a messages list, hashed once per list object"""
+    # Process-wide caches are keyed by this, so it must tell apart lists from
+    # different sessions that merely share a length and newest ID
+    cached = st.session_state.get('messages_fingerprint')
+    if cached is not None and cached[0] is messages:
+        return cached[1]
+    fingerprint = (
+        len(messages),
+        hash(tuple(tuple(str(m.get(field, "")) for field in MESSAGE_FIELDS) for m in messages))
+    )
+    # The mirror is only ever replaced, never mutated, so identity marks a change
+    st.session_state.messages_fingerprint = (messages, fingerprint)
+    return fingerprint
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _bucket_messages(fingerprint, _messages):
+    """Group messages by sender in one pass; returns (sorted senders, buckets)"""
+    buckets = {}
+    for m in _messages:
+        buckets.setdefault(m.get("name", "Anonymous"), []).append(m)
+    return sorted(buckets), buckets
+
+def summarize_messages(messages, sender_filter):
+    """Get (senders, filtered messages, unique filtered senders), cached per messages fingerprint"""
+    senders, buckets = _bucket_messages(messages_fingerprint(messages), messages)
+    if sender_filter == "All":
+        return senders, messages, len(senders)
+    filtered = buckets.get(sender_filter, [])
+    return senders, filtered, 1 if filtered else 0
+
+def message_to_row(msg):
+    """Convert a message dict into a Google Sheets row"""
+    return [
+        msg.get("id", ""),
+        msg.get("name", "Anonymous"),
+        msg.get("recipient", "Anyone"),
+        msg.get("message", ""),
+        msg.get("tone", ""),
+        msg.get("timestamp", "")
+    ]
+
+def encode_messages_json(messages):
+    """Serialize messages to pretty-printed UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(messages, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+    return json.dumps(messages, ensure_ascii=False, indent=2).encode("utf-8")
+
+@st.cache_resource(show_spinner=False)
+def get_write_executor():
+    """Get the thread pool that runs one-off Google API calls off the rerun thread"""
+    return ThreadPoolExecutor(max_workers=2)
+
+@st.cache_resource(show_spinner=False)
+def get_append_queue():
+    """Get the process-wide queue of pending Sheets appends and start its writer thread"""
+    append_queue = queue.Queue()
+    threading.Thread(target=_drain_appends, args=(append_queue,), daemon=True).start()
+    return append_queue
+
+def _drain_appends(append_queue):
+    """Writer thread: coalesce whatever has queued up into one append_rows per worksheet"""
+    while True:
+        batch = [append_queue.get()]
+        while len(batch) < SHEETS_APPEND_BATCH:
+            try:
+                batch.append(append_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        by_worksheet = {}
+        for worksheet, entry, future in batch:
+            by_worksheet.setdefault(id(worksheet), (worksheet, []))[1].append((entry, future))
+        
+        for worksheet, items in by_worksheet.values():
+            try:
+                call_sheets_write_background(
+                    worksheet.append_rows,
+                    [message_to_row(entry) for entry, _ in items],
+                    value_input_option="RAW",
+                    insert_data_option="INSERT_ROWS",
+                    table_range="A1"
+                )
+            except Exception as exc:
+                for _, future in items:
+                    future.set_exception(exc)
+            else:
+                for _, future in items:
+                    future.set_result(None)
+
+def sync_pending_writes():
+    """Settle finished background writes and refetch messages once they land"""
+    futures = st.session_state.get('write_futures')
+    if not futures:
+        return
     
-    try:
-        with DATA_FILE.open("w", encoding="utf-8") as f:
-            json.dump(messages, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+    done = {msg_id: future for msg_id, future in futures.items() if future.done()}
+    if not done:
+        return
+    
+    pending = st.session_state.get('pending_messages', [])
+    st.session_state.write_futures = {k: f for k, f in futures.items() if k not in done}
+    st.session_state.pending_messages = [m for m in pending if m.get("id") not in done]
+    for entry in pending:
+        future = done.get(entry.get("id"))
+        if future is not None and future.exception() is not None:
+            append_local_message(entry)
+    
+    # Refetch and recount so the list and totals reflect where the settled writes landed
+    refresh_messages()
 
 def append_message(entry):
     """Append a single message to storage"""
-    msgs = read_messages()
-    msgs.append(entry)
-    write_messages(msgs)
+    update_message_stats(entry)
+    messages = read_messages()
+    # A local fallback from a failed Sheets read is never mirrored; the pending list covers the entry
+    if 'messages_mirror' in st.session_state:
+        # Reassign rather than mutate session_state containers so overlapping reruns
+        # never observe a half-updated list
+        st.session_state.messages_mirror = messages + [entry]
+    worksheet = get_worksheet()
+    if worksheet:
+        # The mirror already shows the message; let the Sheets write finish in the background
+        st.session_state.pending_messages = st.session_state.get('pending_messages', []) + [entry]
+        future = Future()
+        get_append_queue().put((worksheet, entry, future))
+        st.session_state.write_futures = {**st.session_state.get('write_futures', {}), entry["id"]: future}
+        return
+    
+    append_local_message(entry)
+    invalidate_messages_cache()
+
+def _row_runs(rows):
+    """Group ascending row numbers into [start, end] runs of consecutive rows"""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
 
-def delete_message_by_id(msg_id):
-    """Delete a message by ID"""
-    msgs = read_messages()
-    msgs = [m for m in msgs if m.get("id") != msg_id]
-    write_messages(msgs)
+def delete_messages_by_id(msg_ids):
+    """Delete several messages with one ID lookup and one delete per contiguous run of rows"""
+    msg_ids = set(msg_ids)
+    if not msg_ids:
+        return
+    worksheet = get_worksheet()
+    if worksheet:
+        try:
+            # Only the ID column is needed to locate rows, not the whole sheet
+            ids = call_sheets(worksheet.col_values, 1)
+            rows = [row for row, value in enumerate(ids, start=1) if value in msg_ids]
+            # Delete bottom-up so earlier row indices stay valid
+            for start, end in reversed(_row_runs(rows)):
+                call_sheets_write(worksheet.delete_rows, start, end)
+            refresh_messages()
+            return
+        except Exception:
+            pass
+    
+    delete_local_messages(msg_ids)
+    refresh_messages()
 
-def get_admin_secret():
-    return st.secrets.get(ADMIN_SECRET_KEY_NAME) if ADMIN_SECRET_KEY_NAME in st.secrets else None
+@st.cache_resource(show_spinner=False)
+def get_admin_secret_digest():
+    """Hash the configured admin key once per process (None when unset)"""
+    secret = st.secrets.get(ADMIN_SECRET_KEY_NAME)
+    if not secret:
+        return None
+    return hashlib.sha256(str(secret).encode("utf-8")).digest()
 
 def is_admin_key_valid(provided_key):
-    secret = get_admin_secret()
-    if not secret:
+    digest = get_admin_secret_digest()
+    if not digest or not provided_key:
         return False
-    return provided_key and provided_key == secret
+    # Equal-length digests compared in constant time, so timing reveals nothing about the key
+    return hmac.compare_digest(digest, hashlib.sha256(provided_key.encode("utf-8")).digest())
 
 # ---------- PDF GENERATION ----------
-def generate_pdf_buffer(messages, title="Good Luck Board Messages"):
-    """Create a beautiful PDF with modern styling"""
-    buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4, topMargin=20*mm, bottomMargin=20*mm)
-    
+class PdfStyles(NamedTuple):
+    """ReportLab styles shared by every PDF export"""
+    heading: ParagraphStyle
+    message: ParagraphStyle
+    title: ParagraphStyle
+    timestamp: ParagraphStyle
+    header_table: TableStyle
+    divider_color: colors.Color
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_styles():
+    """Build the PDF paragraph and table styles once per process"""
     styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='MessageStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.darkblue,
-        spaceAfter=12,
-    ))
-    
-    elements = []
-    
-    title_style = ParagraphStyle(
-        name='TitleStyle',
-        parent=styles['Heading1'],
-        textColor=colors.HexColor(COLORS["primary"]),
-        spaceAfter=30,
-        alignment=1
-    )
-    elements.append(Paragraph(title, title_style))
-    
-    for msg in reversed(messages):
-        header_data = [
-            [
-                Paragraph(f"<b>From:</b> {msg.get('name','Anonymous')}", styles['Heading3']),
-                Paragraph(f"<b>To:</b> {msg.get('recipient','Anyone')}", styles['Heading3']),
-                Paragraph(f"<b>Style:</b> {msg.get('tone','')}", styles['Heading3'])
-            ]
-        ]
-        
-        header_table = Table(header_data, colWidths=[doc.width/3]*3)
-        header_table.setStyle(TableStyle([
+    return PdfStyles(
+        heading=styles['Heading3'],
+        message=ParagraphStyle(
+            name='MessageStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.darkblue,
+            spaceAfter=12,
+        ),
+        title=ParagraphStyle(
+            name='TitleStyle',
+            parent=styles['Heading1'],
+            textColor=colors.HexColor(COLORS["primary"]),
+            spaceAfter=30,
+            alignment=1
+        ),
+        timestamp=ParagraphStyle(
+            name='TimestampStyle',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.gray,
+            alignment=2
+        ),
+        header_table=TableStyle([
             ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor(COLORS["background"])),
             ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor(COLORS["text_primary"])),
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
@@ -312,38 +735,80 @@ def generate_pdf_buffer(messages, title="Good Luck Board Messages"):
             ('FONTSIZE', (0, 0), (-1, -1), 10),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
             ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        elements.append(header_table)
-        
-        timestamp_style = ParagraphStyle(
-            name='TimestampStyle',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.gray,
-            alignment=2
-        )
-        elements.append(Paragraph(msg.get("timestamp", ""), timestamp_style))
-        elements.append(Spacer(1, 8))
+        ]),
+        divider_color=colors.HexColor(COLORS["border"])
+    )
+
+def _pdf_message_flowables(messages, pdf_styles, col_widths):
+    """Yield one list of flowables per message, newest first"""
+    for msg in reversed(messages):
+        # Paragraph parses its text as markup, so user content is escaped first
+        header_data = [
+            [
+                Paragraph(f"<b>From:</b> {xml_escape(str(msg.get('name','Anonymous')))}", pdf_styles.heading),
+                Paragraph(f"<b>To:</b> {xml_escape(str(msg.get('recipient','Anyone')))}", pdf_styles.heading),
+                Paragraph(f"<b>Style:</b> {xml_escape(str(msg.get('tone','')))}", pdf_styles.heading)
+            ]
+        ]
         
-        message_text = msg.get("message", "").replace("\n", "<br/>")
-        elements.append(Paragraph(message_text, styles['MessageStyle']))
-        elements.append(Spacer(1, 20))
+        header_table = Table(header_data, colWidths=col_widths)
+        header_table.setStyle(pdf_styles.header_table)
         
-        elements.append(Spacer(1, 1))
-        elements.append(Table([[None]], colWidths=[doc.width], style=[
-            ('LINEABOVE', (0, 0), (-1, -1), 1, colors.HexColor(COLORS["border"]))
-        ]))
-        elements.append(Spacer(1, 20))
+        message_text = xml_escape(str(msg.get("message", ""))).replace("\n", "<br/>")
+        yield [
+            header_table,
+            Paragraph(xml_escape(str(msg.get("timestamp", ""))), pdf_styles.timestamp),
+            Spacer(1, 8),
+            Paragraph(message_text, pdf_styles.message),
+            Spacer(1, 20),
+            HRFlowable(width="100%", thickness=1, color=pdf_styles.divider_color),
+            Spacer(1, 20),
+        ]
+
+class BatchedDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that pulls message flowables in batches while laying out pages"""
     
-    doc.build(elements)
+    def build_batched(self, first_flowables, message_chunks, batch_size=PDF_BATCH_SIZE):
+        self._message_chunks = iter(message_chunks)
+        self._batch_size = batch_size
+        self._queue = list(first_flowables)
+        self.build(self._queue)
+    
+    def handle_flowable(self, flowables):
+        # Top up before the queue runs dry so build() never sees it empty early;
+        # build() also routes internal page-begin actions through here, skip those
+        if flowables is self._queue and len(flowables) < 2:
+            for chunk in islice(self._message_chunks, self._batch_size):
+                flowables.extend(chunk)
+        super().handle_flowable(flowables)
+
+def generate_pdf_buffer(messages, title="Good Luck Board Messages"):
+    """Create a beautiful PDF with modern styling"""
+    buf = BytesIO()
+    doc = BatchedDocTemplate(buf, pagesize=A4, topMargin=20*mm, bottomMargin=20*mm)
+    pdf_styles = get_pdf_styles()
+    
+    doc.build_batched(
+        [Paragraph(xml_escape(title), pdf_styles.title)],
+        _pdf_message_flowables(messages, pdf_styles, [doc.width/3]*3)
+    )
     buf.seek(0)
     return buf
 
+@st.cache_data(show_spinner=False, ttl=24*60*60, max_entries=4)
+def _pdf_cached(fingerprint, _messages):
+    """Render the PDF once per messages fingerprint (``_messages`` is not hashed)"""
+    return generate_pdf_buffer(_messages).getvalue()
+
+def get_pdf_bytes(messages):
+    """Get the exported PDF, re-rendering only when the messages change"""
+    return _pdf_cached(messages_fingerprint(messages), messages)
+
 # ---------- UI UTILITIES ----------
-def apply_custom_styles():
-    """Apply custom CSS for modern styling and mobile responsiveness"""
-    st.markdown(f"""
-    <style>
+@st.cache_resource(show_spinner=False)
+def _build_css():
+    """Format and minify the app stylesheet once per process"""
+    css = f"""
     /* Main background */
     .stApp {{
         background: linear-gradient(135deg, {COLORS['background']} 0%, #FFFFFF 100%);
@@ -387,67 +852,6 @@ def apply_custom_styles():
         box-shadow: 0 6px 20px rgba(99, 102, 241, 0.4);
     }}
     
-    /* Enhanced Mobile Sidebar Handling */
-    @media (max-width: 768px) {{
-        /* Hide sidebar completely when collapsed */
-        section[data-testid="stSidebar"][aria-expanded="false"] {{
-            display: none !important;
-        }}
-        
-        /* Full screen sidebar when expanded */
-        section[data-testid="stSidebar"][aria-expanded="true"] {{
-            width: 100vw !important;
-            min-width: 100vw !important;
-            position: fixed !important;
-            height: 100vh !important;
-            z-index: 999999 !important;
-            top: 0 !important;
-            left: 0 !important;
-        }}
-        
-        /* Ensure main content is visible */
-        .main .block-container {{
-            padding-left: 1rem !important;
-            padding-right: 1rem !important;
-        }}
-        
-        /* Mobile menu toggle */
-        .mobile-menu-toggle {{
-            position: fixed;
-            top: 15px;
-            left: 15px;
-            z-index: 10000;
-            background: {COLORS['primary']};
-            color: white;
-            border: none;
-            border-radius: 50%;
-            width: 50px;
-            height: 50px;
-            font-size: 1.5rem;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.3);
-            cursor: pointer;
-        }}
-        
-        /* Close button for sidebar */
-        .sidebar-close {{
-            position: absolute;
-            top: 15px;
-            right: 15px;
-            background: {COLORS['primary']};
-            color: white;
-            border: none;
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            font-size: 1.2rem;
-            z-index: 1000000;
-            cursor: pointer;
-        }}
-    }}
-    
     @media (min-width: 769px) {{
         section[data-testid="stSidebar"] {{
             width: 380px !important;
@@ -520,43 +924,6 @@ def apply_custom_styles():
         margin-left: 8px;
     }}
     
-    /* Mobile optimizations */
-    @media (max-width: 768px) {{
-        .mobile-stack {{
-            flex-direction: column !important;
-        }}
-        
-        .mobile-full-width {{
-            width: 100% !important;
-        }}
-        
-        .mobile-center {{
-            text-align: center !important;
-        }}
-        
-        .mobile-padding {{
-            padding: 1rem !important;
-        }}
-        
-        .mobile-margin {{
-            margin: 0.5rem 0 !important;
-        }}
-        
-        h1 {{
-            font-size: 2rem !important;
-            text-align: center;
-        }}
-        
-        h2 {{
-            font-size: 1.5rem !important;
-        }}
-        
-        .message-card {{
-            padding: 16px !important;
-            margin: 8px 0 !important;
-        }}
-    }}
-    
     /* Tablet optimizations */
     @media (min-width: 769px) and (max-width: 1024px) {{
         section[data-testid="stSidebar"] {{
@@ -569,18 +936,6 @@ def apply_custom_styles():
         }}
     }}
     
-    /* Recipients section for mobile */
-    @media (max-width: 768px) {{
-        .recipients-container {{
-            flex-direction: column !important;
-            gap: 0.5rem !important;
-        }}
-        
-        .recipient-item {{
-            margin: 0.25rem 0 !important;
-        }}
-    }}
-    
     /* Navigation helpers */
     .scroll-target {{
         scroll-margin-top: 80px;
@@ -630,14 +985,125 @@ def apply_custom_styles():
         box-shadow: 0 6px 20px rgba(0,0,0,0.3);
     }}
     
+    /* Mobile (sidebar, layout, recipients, quick nav) */
     @media (max-width: 768px) {{
-        .quick-nav {{
+        /* Hide sidebar completely when collapsed */
+        section[data-testid="stSidebar"][aria-expanded="false"] {{
+            display: none !important;
+        }}
+        
+        /* Full screen sidebar when expanded */
+        section[data-testid="stSidebar"][aria-expanded="true"] {{
+            width: 100vw !important;
+            min-width: 100vw !important;
+            position: fixed !important;
+            height: 100vh !important;
+            z-index: 999999 !important;
+            top: 0 !important;
+            left: 0 !important;
+        }}
+        
+        /* Ensure main content is visible */
+        .main .block-container {{
+            padding-left: 1rem !important;
+            padding-right: 1rem !important;
+        }}
+        
+        /* Mobile menu toggle */
+        .mobile-menu-toggle {{
+            position: fixed;
+            top: 15px;
+            left: 15px;
+            z-index: 10000;
+            background: {COLORS['primary']};
+            color: white;
+            border: none;
+            border-radius: 50%;
+            width: 50px;
+            height: 50px;
+            font-size: 1.5rem;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            box-shadow: 0 4px 20px rgba(0,0,0,0.3);
+            cursor: pointer;
+        }}
+        
+        /* Close button for sidebar */
+        .sidebar-close {{
+            position: absolute;
+            top: 15px;
+            right: 15px;
+            background: {COLORS['primary']};
+            color: white;
+            border: none;
+            border-radius: 50%;
+            width: 40px;
+            height: 40px;
+            font-size: 1.2rem;
+            z-index: 1000000;
+            cursor: pointer;
+        }}
+        
+        .mobile-stack {{
+            flex-direction: column !important;
+        }}
+        
+        .mobile-full-width {{
+            width: 100% !important;
+        }}
+        
+        .mobile-center {{
+            text-align: center !important;
+        }}
+        
+        .mobile-padding {{
+            padding: 1rem !important;
+        }}
+        
+        .mobile-margin {{
+            margin: 0.5rem 0 !important;
+        }}
+        
+        h1 {{
+            font-size: 2rem !important;
+            text-align: center;
+        }}
+        
+        h2 {{
+            font-size: 1.5rem !important;
+        }}
+        
+        .message-card {{
+            padding: 16px !important;
+            margin: 8px 0 !important;
+        }}
+        
+        .recipients-container {{
+            flex-direction: column !important;
+            gap: 0.5rem !important;
+        }}
+        
+        .recipient-item {{
+            margin: 0.25rem 0 !important;
+        }}
+        
+        .quick-nav {{
             bottom: 70px;
             right: 15px;
         }}
     }}
-    </style>
-    """, unsafe_allow_html=True)
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return f"<style>{css.strip()}</style>"
+
+def apply_custom_styles():
+    """Apply custom CSS for modern styling and mobile responsiveness"""
+    # Streamlit drops elements that are not re-emitted on a rerun, so the
+    # stylesheet is still written every run; only the formatting is cached.
+    st.markdown(_build_css(), unsafe_allow_html=True)
 
 def create_tone_badge(tone):
     """Create a styled badge for message tones"""
@@ -652,14 +1118,111 @@ def create_tone_badge(tone):
     color = tone_colors.get(tone, COLORS["text_secondary"])
     return f'<span class="tone-badge" style="background: {color}15; color: {color}; border: 1px solid {color}30;">{tone}</span>'
 
-def add_enhanced_navigation_js():
-    """Add enhanced JavaScript for navigation and auto-scrolling"""
-    st.markdown("""
+def apply_template(text):
+    """Load a template into the message box, replacing any unsent draft"""
+    # A keyed text area keeps its widget state over a changed value=, so the widget state is set
+    st.session_state.message_input = text
+    st.session_state.auto_scroll_to = "message-input"
+
+def submit_message():
+    """Store the submitted compose form; the rerun that follows renders the result"""
+    message = st.session_state.message_input.strip()
+    if not message:
+        st.session_state.submit_status = "empty"
+        return
+    
+    if st.session_state.emoji_buffer:
+        message = message + " " + " ".join(st.session_state.emoji_buffer)
+    
+    entry = {
+        "id": secrets.token_hex(8),
+        "name": (st.session_state.name_input.strip() or "Anonymous"),
+        "recipient": RECIPIENT_TEXT.recipient_string,
+        "message": message,
+        "tone": st.session_state.tone_select,
+        "timestamp": strftime("%Y-%m-%d %H:%M:%S UTC", gmtime())
+    }
+    
+    append_message(entry)
+    st.session_state.emoji_buffer = []
+    st.session_state.form = {"name": "", "tone": "inspirational"}
+    st.session_state.submit_status = "sent"
+    # Show the new message in the board, as the compose/view switch did before tabs
+    st.session_state.auto_scroll_to = "messages-section"
+
+def handle_emoji_pick(key):
+    """Move the picked emoji into the buffer and reset the picker widget"""
+    emj = st.session_state.get(key)
+    if not emj:
+        return
+    st.session_state.emoji_buffer = st.session_state.emoji_buffer + [emj]
+    st.session_state[key] = None
+    st.session_state.auto_scroll_to = "message-input"
+
+def clear_emoji_buffer():
+    """Drop all selected emojis"""
+    st.session_state.emoji_buffer = []
+
+def set_message_page(page):
+    """Jump the message list to the given page"""
+    st.session_state.page = page
+
+def delete_selected_messages(msg_ids):
+    """Delete the messages selected in the admin table in a single storage pass"""
+    # Row positions would point at different messages once these are gone
+    st.session_state.pop("admin_recent", None)
+    delete_messages_by_id(msg_ids)
+
+def prepare_pdf_export():
+    """Mark the current messages as wanted in PDF form so the admin panel renders it"""
+    st.session_state.pdf_ready_for = messages_fingerprint(read_messages())
+
+def authenticate_admin():
+    """Check the entered admin password before the rerun renders the panel"""
+    if is_admin_key_valid(st.session_state.get("admin_input")):
+        st.session_state.admin_authenticated = True
+    else:
+        st.session_state.admin_auth_failed = True
+
+def logout_admin():
+    """Leave admin mode"""
+    st.session_state.admin_authenticated = False
+
+@st.cache_resource(show_spinner=False)
+def _build_navigation_js():
+    """Strip comments and indentation from the navigation script once per process"""
+    js = """
     <script>
-    // Enhanced navigation functions
+    // Runs inside a zero-height component frame; everything acts on the app page around it
+    const win = window.parent;
+    const doc = win.document;
+    
+    function tagFields() {
+        const messageInputs = doc.querySelectorAll('.stTextArea textarea');
+        if (messageInputs.length > 0 && !messageInputs[0].id) {
+            messageInputs[0].id = 'message-input';
+            messageInputs[0].classList.add('scroll-target');
+        }
+    }
+    
+    function showTabOf(element) {
+        // Both tabs stay in the page; a target in the hidden one needs its tab opened first
+        const panel = element.closest('[role="tabpanel"][hidden]');
+        const tab = panel && doc.getElementById(panel.getAttribute('aria-labelledby'));
+        if (tab) {
+            tab.click();
+            return true;
+        }
+        return false;
+    }
+    
     function scrollToElement(elementId, highlight = true) {
-        const element = document.getElementById(elementId);
-        if (element) {
+        tagFields();
+        const element = doc.getElementById(elementId);
+        if (element && showTabOf(element)) {
+            // Scroll once the opened panel has been laid out
+            setTimeout(() => scrollToElement(elementId, highlight), 100);
+        } else if (element) {
             element.scrollIntoView({ behavior: 'smooth', block: 'center' });
             
             if (highlight) {
@@ -671,17 +1234,17 @@ def add_enhanced_navigation_js():
         }
     }
     
-    function scrollToTop() {
-        window.scrollTo({ top: 0, behavior: 'smooth' });
-    }
-    
-    function scrollToBottom() {
-        window.scrollTo({ top: document.body.scrollHeight, behavior: 'smooth' });
+    function scrollToEdge(block) {
+        // The scrolling element differs between layouts; scrolling the content into view works in all
+        const main = doc.querySelector('[data-testid="stMainBlockContainer"]');
+        if (main) {
+            main.scrollIntoView({ behavior: 'smooth', block: block });
+        }
     }
     
     function closeMobileSidebar() {
         // Find and click the sidebar close button
-        const sidebar = document.querySelector('section[data-testid="stSidebar"]');
+        const sidebar = doc.querySelector('section[data-testid="stSidebar"]');
         if (sidebar) {
             const closeBtn = sidebar.querySelector('button[aria-label="Close"]');
             if (closeBtn) {
@@ -690,89 +1253,280 @@ def add_enhanced_navigation_js():
         }
     }
     
-    function navigateToSection(section, scrollToField = null) {
+    function toggleSidebar() {
+        const sidebar = doc.querySelector('section[data-testid="stSidebar"]');
+        if (sidebar) {
+            const toggle = sidebar.querySelector('button[kind="header"]');
+            if (toggle) toggle.click();
+        }
+    }
+    
+    function requestScroll(elementId) {
         // Close sidebar on mobile
-        if (window.innerWidth <= 768) {
+        if (win.innerWidth <= 768) {
             setTimeout(closeMobileSidebar, 300);
         }
         
-        // Scroll to section after a short delay to allow page update
-        setTimeout(() => {
-            if (scrollToField) {
-                scrollToElement(scrollToField, true);
-            } else if (section === 'compose') {
-                scrollToElement('compose-section', false);
-            } else if (section === 'messages') {
-                scrollToElement('messages-section', false);
-            }
-        }, 500);
+        // Scroll after a short delay to allow page update; only fields are highlighted, not whole sections
+        setTimeout(() => scrollToElement(elementId, !elementId.endsWith('-section')), 800);
     }
     
-    // Initialize navigation
-    document.addEventListener('DOMContentLoaded', function() {
-        // Add IDs to key elements
-        setTimeout(() => {
-            const messageInputs = document.querySelectorAll('.stTextArea textarea');
-            if (messageInputs.length > 0 && !messageInputs[0].id) {
-                messageInputs[0].id = 'message-input';
-                messageInputs[0].classList.add('scroll-target');
-            }
-            
-            // Create navigation buttons
-            createNavButtons();
-            
-            // Add mobile menu functionality
-            setupMobileMenu();
-        }, 1000);
-    });
-    
     function createNavButtons() {
-        if (document.getElementById('quick-nav-buttons')) return;
+        if (doc.getElementById('quick-nav-buttons')) return;
         
-        const navContainer = document.createElement('div');
+        const navContainer = doc.createElement('div');
         navContainer.id = 'quick-nav-buttons';
         navContainer.className = 'quick-nav';
-        navContainer.innerHTML = `
-            <button class="nav-btn" onclick="scrollToTop()" title="Scroll to Top">↑</button>
-            <button class="nav-btn" onclick="scrollToBottom()" title="Scroll to Bottom">↓</button>
-        `;
-        document.body.appendChild(navContainer);
+        navContainer.innerHTML = '<button class="nav-btn" data-nav="top" title="Scroll to Top">↑</button>'
+            + '<button class="nav-btn" data-nav="bottom" title="Scroll to Bottom">↓</button>';
+        doc.body.appendChild(navContainer);
     }
     
     function setupMobileMenu() {
         // Add mobile menu toggle if it doesn't exist
-        if (!document.getElementById('mobile-menu-toggle')) {
-            const toggleBtn = document.createElement('button');
+        if (!doc.getElementById('mobile-menu-toggle')) {
+            const toggleBtn = doc.createElement('button');
             toggleBtn.id = 'mobile-menu-toggle';
             toggleBtn.className = 'mobile-menu-toggle';
+            toggleBtn.dataset.nav = 'toggle-sidebar';
             toggleBtn.innerHTML = '☰';
-            toggleBtn.onclick = function() {
-                const sidebar = document.querySelector('section[data-testid="stSidebar"]');
-                if (sidebar) {
-                    const toggle = sidebar.querySelector('button[kind="header"]');
-                    if (toggle) toggle.click();
-                }
-            };
-            document.body.appendChild(toggleBtn);
+            doc.body.appendChild(toggleBtn);
         }
     }
     
-    // Global function to handle template selection
-    window.handleTemplateSelect = function(templateText) {
-        navigateToSection('compose', 'message-input');
+    // One delegated click handler on the page, swapped each time this frame loads
+    // so it never points into a frame Streamlit has already replaced
+    if (win.navClickHandler) {
+        doc.removeEventListener('click', win.navClickHandler);
     }
+    win.navClickHandler = function(event) {
+        const target = event.target.closest('[data-nav]');
+        if (!target) return;
+        
+        const action = target.dataset.nav;
+        if (action === 'top') {
+            scrollToEdge('start');
+        } else if (action === 'bottom') {
+            scrollToEdge('end');
+        } else if (action === 'close-sidebar') {
+            closeMobileSidebar();
+        } else if (action === 'toggle-sidebar') {
+            toggleSidebar();
+        }
+    };
+    doc.addEventListener('click', win.navClickHandler);
     
-    // Global function to handle emoji selection
-    window.handleEmojiSelect = function() {
-        navigateToSection('compose', 'message-input');
+    function checkScrollRequest() {
+        const hook = doc.querySelector('.scroll-request');
+        if (!hook) return;
+        
+        // Requests are numbered per session; remembering the last one on the page
+        // means a reloaded frame never repeats a scroll
+        const request = Number(hook.dataset.scrollRequest);
+        if (request > (win.lastScrollRequest || 0)) {
+            win.lastScrollRequest = request;
+            requestScroll(hook.dataset.scrollTo);
+        }
     }
     
-    // Global function to handle navigation
-    window.handleNavigation = function(section) {
-        navigateToSection(section);
+    // Reruns deliver scroll requests through the hidden hook element, not by reloading this frame
+    if (win.navScrollObserver) {
+        win.navScrollObserver.disconnect();
     }
+    win.navScrollObserver = new MutationObserver(checkScrollRequest);
+    win.navScrollObserver.observe(doc.body, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ['data-scroll-request']
+    });
+    
+    tagFields();
+    createNavButtons();
+    setupMobileMenu();
+    checkScrollRequest();
     </script>
-    """, unsafe_allow_html=True)
+    """
+    # Only whole-line comments are removed; newlines are kept for automatic semicolon insertion
+    js = re.sub(r"^[ \t]*//.*\n", "", js, flags=re.M)
+    return re.sub(r"\n\s*", "\n", js).strip()
+
+def add_enhanced_navigation_js():
+    """Run the navigation script in a zero-height frame whose HTML never changes, so it loads once per page"""
+    components.html(_build_navigation_js(), height=0)
+
+def add_scroll_request():
+    """Hand a pending auto-scroll to the navigation script through a hidden hook element"""
+    target = st.session_state.auto_scroll_to
+    if target:
+        st.session_state.scroll_requests = st.session_state.get("scroll_requests", 0) + 1
+        st.session_state.scroll_target = target
+        # Reset the auto-scroll flag
+        st.session_state.auto_scroll_to = None
+    # Emitted on every run, so the elements after it keep their positions
+    st.markdown(
+        SCROLL_REQUEST_TEMPLATE.format(
+            request=st.session_state.get("scroll_requests", 0),
+            target=st.session_state.get("scroll_target", "")
+        ),
+        unsafe_allow_html=True
+    )
+
+# ---------- HTML TEMPLATES ----------
+# Single-pass escaping for user content placed inside unsafe_allow_html markup.
+# Newlines become character references so a blank line in a message cannot end
+# the surrounding markdown HTML block (the card body uses white-space: pre-wrap).
+_HTML_ESCAPE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+    "\n": "&#10;",
+})
+
+# Theme colors are interpolated once here; only the per-message fields are left,
+# filled positionally with % (name, tone badge, timestamp, body)
+CARD_TEMPLATE = f"""<div class="message-card mobile-padding">
+    <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 1rem;" class="mobile-stack">
+        <div class="mobile-full-width mobile-margin">
+            <div style="display: flex; align-items: center; gap: 0.5rem; flex-wrap: wrap;">
+                <h4 style="margin: 0; color: {COLORS['text_primary']};">%s</h4>
+                %s
+            </div>
+        </div>
+        <div style="font-size: 0.8rem; color: {COLORS['text_secondary']};" class="mobile-full-width mobile-margin">%s</div>
+    </div>
+    <div style="
+        padding: 1.5rem;
+        background: {COLORS['background']};
+        border-radius: 12px;
+        border-left: 4px solid {COLORS['primary']};
+        font-size: 1rem;
+        line-height: 1.6;
+        color: {COLORS['text_primary']};
+        white-space: pre-wrap;
+    " class="mobile-padding">%s</div>
+</div>
+"""
+
+@st.cache_resource(show_spinner=False)
+def _card_html_cache():
+    """Process-wide map of a message's rendered fields to its escaped card markup"""
+    return {}
+
+def render_message_card(m):
+    """Escape and fill one card, reusing the markup already built for the same content"""
+    # Keyed on content rather than ID, so a row edited in the sheet renders afresh
+    fields = (
+        str(m.get("name", "Anonymous")),
+        str(m.get("tone", "")),
+        str(m.get("timestamp", "")),
+        str(m.get("message", ""))
+    )
+    cache = _card_html_cache()
+    card = cache.get(fields)
+    if card is None:
+        name, tone, timestamp, message = (field.translate(_HTML_ESCAPE) for field in fields)
+        card = CARD_TEMPLATE % (name, create_tone_badge(tone), timestamp, message)
+        # Deleted and edited messages leave stale entries behind; start over once the map is large
+        if len(cache) >= CARD_CACHE_LIMIT:
+            cache.clear()
+        cache[fields] = card
+    return card
+
+QUICK_TOOLS_HTML = f"""<div style="padding: 1rem 0; text-align: center;">
+    <h2 style="color: {COLORS['text_primary']}; margin-bottom: 0;">✨ Quick Tools</h2>
+</div>
+"""
+
+SELECTED_EMOJIS_TEMPLATE = f"""<div style="
+    padding: 12px; 
+    background: {COLORS["background"]}; 
+    border-radius: 8px; 
+    text-align: center; 
+    font-size: 1.2em;
+    border: 1px solid {COLORS["border"]};
+    margin: 8px 0;
+">{{selected_text}}</div>
+"""
+
+ADMIN_STATS_TEMPLATE = f"""<div style="background: {COLORS['background']}; padding: 1rem; border-radius: 8px; border: 1px solid {COLORS['border']}; margin-bottom: 1rem;">
+    <h4 style="margin: 0 0 0.5rem 0; color: {COLORS['text_primary']};">📊 Statistics</h4>
+    <div style="display: flex; justify-content: space-between;">
+        <div>
+            <div style="font-size: 0.8rem; color: {COLORS['text_secondary']};">Total Messages</div>
+            <div style="font-size: 1.2rem; font-weight: bold; color: {COLORS['primary']};">{{total}}</div>
+        </div>
+        <div>
+            <div style="font-size: 0.8rem; color: {COLORS['text_secondary']};">Unique Senders</div>
+            <div style="font-size: 1.2rem; font-weight: bold; color: {COLORS['secondary']};">{{unique_senders}}</div>
+        </div>
+    </div>
+</div>
+"""
+
+COMPOSE_HEADER_HTML = f"""<div style="background: {COLORS['card_bg']}; padding: 2rem; border-radius: 16px; border: 1px solid {COLORS['border']};" class="mobile-padding" id="compose-section">
+    <h2 style="color: {COLORS['text_primary']}; margin-bottom: 1.5rem;">✨ Create Your Message</h2>
+"""
+
+EMPTY_STATE_HTML = f"""<div style="text-align: center; padding: 4rem 2rem; background: {COLORS['card_bg']}; border-radius: 16px; border: 1px solid {COLORS['border']};" class="mobile-padding" id="messages-section">
+    <h3 style="color: {COLORS['text_secondary']}; margin-bottom: 1rem;">📝 No Messages Yet</h3>
+    <p style="color: {COLORS['text_secondary']}; font-size: 1.1rem;">Be the first to send some encouragement! 💫</p>
+</div>
+"""
+
+VIEW_STATS_TEMPLATE = f"""<div style="background: {COLORS['card_bg']}; padding: 1rem; border-radius: 12px; margin: 1rem 0; border: 1px solid {COLORS['border']};" id="messages-section">
+    <div style="display: flex; justify-content: space-around; text-align: center;" class="mobile-stack">
+        <div class="mobile-margin">
+            <div style="font-size: 0.9rem; color: {COLORS['text_secondary']};">Total Messages</div>
+            <div style="font-size: 1.5rem; font-weight: bold; color: {COLORS['primary']};">{{total}}</div>
+        </div>
+        <div class="mobile-margin">
+            <div style="font-size: 0.9rem; color: {COLORS['text_secondary']};">Unique Senders</div>
+            <div style="font-size: 1.5rem; font-weight: bold; color: {COLORS['secondary']};">{{unique_senders}}</div>
+        </div>
+    </div>
+</div>
+"""
+
+HEADER_HTML = f"""<div class="mobile-center mobile-padding">
+    <h1 style="font-size: 3rem; margin-bottom: 0.5rem; background: linear-gradient(135deg, {COLORS['primary']}, {COLORS['secondary']}); -webkit-background-clip: text; -webkit-text-fill-color: transparent;">{APP_TITLE}</h1>
+    <p style="font-size: 1.2rem; color: {COLORS['text_secondary']}; margin-top: 0;">{APP_SUBTITLE}</p>
+</div>
+"""
+
+@st.cache_resource(show_spinner=False)
+def _build_recipients_html():
+    """Build the featured recipients block once per process ("" when there are none)"""
+    recipients = get_recipient_names()
+    if not recipients:
+        return ""
+    icons = ["🎓", "🎓", "🌟", "💫", "⭐", "🔥","🏆"]
+    recipient_items = "".join(
+        f'<div class="recipient-item" style="color: {COLORS["primary"] if i % 2 == 0 else COLORS["secondary"]}; margin: 0 1rem;">{icons[i % len(icons)]} {recipient}</div>'
+        for i, recipient in enumerate(recipients)
+    )
+    return f"""<div style="text-align: center; background: {COLORS['primary']}10; padding: 1.5rem; border-radius: 16px; margin: 1rem 0; border: 2px solid {COLORS['primary']}20;">
+    <h3 style="color: {COLORS['primary']}; margin-bottom: 1rem;">{RECIPIENT_TEXT.display_text}</h3>
+    <div class="recipients-container" style="display: flex; justify-content: center; gap: 2rem; font-size: 1.3rem; font-weight: bold; flex-wrap: wrap;">
+        {recipient_items}
+    </div>
+    <p style="color: {COLORS['text_secondary']}; margin-top: 1rem; font-size: 1rem;">
+        Send your warm wishes and encouragement to help them succeed!
+    </p>
+</div>
+"""
+
+PAGE_INDICATOR_TEMPLATE = f"<div style='text-align: center; color: {COLORS['text_secondary']};'>Page {{page}} of {{page_count}}</div>"
+
+SCROLL_REQUEST_TEMPLATE = '<div class="scroll-request" data-scroll-request="{request}" data-scroll-to="{target}" style="display: none;"></div>'
+
+FOOTER_TEMPLATE = f"""<div style="text-align: center; color: {COLORS['text_secondary']}; padding: 2rem 0;">
+    <p>Made with ❤️ for spreading positivity and best wishes during exams</p>
+    <p style="font-size: 0.9rem;">📧 Messages: {{count}}</p>
+</div>
+"""
 
 # ---------- STREAMLIT UI ----------
 st.set_page_config(
@@ -783,59 +1537,33 @@ st.set_page_config(
 )
 
 apply_custom_styles()
-add_enhanced_navigation_js()
-
-# Initialize Google Sheets connection
-if 'google_worksheet' not in st.session_state:
-    st.session_state.google_worksheet = init_google_sheets()
 
 # Initialize session state
 if "emoji_buffer" not in st.session_state:
     st.session_state.emoji_buffer = []
 if "form" not in st.session_state:
-    st.session_state.form = {"name": "", "message": "", "tone": "inspirational"}
+    st.session_state.form = {"name": "", "tone": "inspirational"}
 if "active_emoji_category" not in st.session_state:
     st.session_state.active_emoji_category = "🌟 Popular"
 if "admin_authenticated" not in st.session_state:
     st.session_state.admin_authenticated = False
-if "current_tab" not in st.session_state:
-    st.session_state.current_tab = "✍️ Compose Message"
 if "auto_scroll_to" not in st.session_state:
     st.session_state.auto_scroll_to = None
+if "msgs_version" not in st.session_state:
+    st.session_state.msgs_version = 0
+if "anim_enabled" not in st.session_state:
+    st.session_state.anim_enabled = True
 
 # Mobile-friendly header
-st.markdown(f"""
-<div class="mobile-center mobile-padding">
-    <h1 style="font-size: 3rem; margin-bottom: 0.5rem; background: linear-gradient(135deg, {COLORS['primary']}, {COLORS['secondary']}); -webkit-background-clip: text; -webkit-text-fill-color: transparent;">{APP_TITLE}</h1>
-    <p style="font-size: 1.2rem; color: {COLORS['text_secondary']}; margin-top: 0;">{APP_SUBTITLE}</p>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
 # Featured recipients section
-recipients = get_recipient_names()
-if recipients:
-    st.markdown(f"""
-    <div style="text-align: center; background: {COLORS['primary']}10; padding: 1.5rem; border-radius: 16px; margin: 1rem 0; border: 2px solid {COLORS['primary']}20;">
-        <h3 style="color: {COLORS['primary']}; margin-bottom: 1rem;">{get_recipient_display_text()}</h3>
-        <div class="recipients-container" style="display: flex; justify-content: center; gap: 2rem; font-size: 1.3rem; font-weight: bold; flex-wrap: wrap;">
-    """, unsafe_allow_html=True)
-    
-    icons = ["🎓", "🎓", "🌟", "💫", "⭐", "🔥","🏆"]
-    for i, recipient in enumerate(recipients):
-        icon = icons[i % len(icons)]
-        color = COLORS["primary"] if i % 2 == 0 else COLORS["secondary"]
-        st.markdown(f'<div class="recipient-item" style="color: {color}; margin: 0 1rem;">{icon} {recipient}</div>', unsafe_allow_html=True)
-    
-    st.markdown(f"""
-        </div>
-        <p style="color: {COLORS['text_secondary']}; margin-top: 1rem; font-size: 1rem;">
-            Send your warm wishes and encouragement to help them succeed!
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+recipients_html = _build_recipients_html()
+if recipients_html:
+    st.markdown(recipients_html, unsafe_allow_html=True)
 
 # Status indicator
-storage_connected = st.session_state.google_worksheet is not None
+storage_connected = get_worksheet() is not None
 status_color = COLORS["success"] if storage_connected else COLORS["warning"]
 status_icon = "✅" if storage_connected else "🔄"
 status_text = "Storage Connected" if storage_connected else "Processing..."
@@ -844,7 +1572,7 @@ status_text = "Storage Connected" if storage_connected else "Processing..."
 with st.sidebar:
     # Add close button for mobile
     st.markdown("""
-    <button class="sidebar-close" onclick="closeMobileSidebar()">×</button>
+    <button class="sidebar-close" data-nav="close-sidebar">×</button>
     """, unsafe_allow_html=True)
     
     st.markdown(f"""
@@ -853,109 +1581,61 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
     
-    st.markdown(f"""
-    <div style="padding: 1rem 0; text-align: center;">
-        <h2 style="color: {COLORS['text_primary']}; margin-bottom: 0;">✨ Quick Tools</h2>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Quick navigation with auto-scroll
-    st.markdown("### 🧭 Navigation")
-    nav_col1, nav_col2 = st.columns(2)
-    with nav_col1:
-        if st.button("✍️ Compose", use_container_width=True, 
-                    type="primary" if st.session_state.current_tab == "✍️ Compose Message" else "secondary",
-                    key="nav_compose"):
-            st.session_state.current_tab = "✍️ Compose Message"
-            st.session_state.auto_scroll_to = "compose-section"
-            st.rerun()
-    with nav_col2:
-        if st.button("📜 View Messages", use_container_width=True,
-                    type="primary" if st.session_state.current_tab == "📜 View Messages" else "secondary",
-                    key="nav_view"):
-            st.session_state.current_tab = "📜 View Messages"
-            st.session_state.auto_scroll_to = "messages-section"
-            st.rerun()
-    
-    st.markdown("---")
+    st.markdown(QUICK_TOOLS_HTML, unsafe_allow_html=True)
     
     # Templates section with auto-navigation
     with st.expander("🎨 Message Templates", expanded=True):
         st.markdown("**Choose a template to get started:**")
         for template in DEFAULT_TEMPLATES:
-            if st.button(
+            st.button(
                 f"{template['icon']} {template['label']}", 
                 key=f"tmpl_{template['label']}", 
-                use_container_width=True
-            ):
-                st.session_state.form["message"] = template["text"]
-                st.session_state.current_tab = "✍️ Compose Message"
-                st.session_state.auto_scroll_to = "message-input"
-                st.rerun()
+                use_container_width=True,
+                on_click=apply_template,
+                args=(template["text"],)
+            )
     
     st.markdown("---")
     
     # Enhanced emoji picker with auto-navigation
     with st.expander("😊 Emoji Picker", expanded=True):
-        categories = list(EMOJI_CATEGORIES.keys())
-        st.markdown("**Categories:**")
-        
-        # Category buttons
-        cat_cols = st.columns(len(categories))
-        for i, category in enumerate(categories):
-            is_active = st.session_state.active_emoji_category == category
-            if cat_cols[i].button(
-                category, 
-                key=f"cat_{i}", 
-                use_container_width=True,
-                type="primary" if is_active else "secondary"
-            ):
-                st.session_state.active_emoji_category = category
-                st.rerun()
+        # One radio widget picks the category; its change already triggers the rerun
+        st.radio("**Categories:**", EMOJI_CATEGORY_NAMES, key="active_emoji_category", horizontal=True)
         
         st.markdown("---")
         
         # Emoji grid with auto-navigation
-        emojis = EMOJI_CATEGORIES[st.session_state.active_emoji_category]
-        st.markdown(f"**{st.session_state.active_emoji_category}**")
+        active_category = st.session_state.active_emoji_category
+        st.markdown(f"**{active_category}**")
         
-        cols_per_row = 5
-        emoji_cols = st.columns(cols_per_row)
-        for i, emj in enumerate(emojis):
-            col_idx = i % cols_per_row
-            if emoji_cols[col_idx].button(emj, key=f"emoji_{i}_{emj}", use_container_width=True):
-                st.session_state.emoji_buffer.append(emj)
-                st.session_state.current_tab = "✍️ Compose Message"
-                st.session_state.auto_scroll_to = "message-input"
-                st.rerun()
+        emoji_key = f"emoji_pick_{EMOJI_CATEGORY_INDEX[active_category]}"
+        st.pills(
+            "Emojis",
+            EMOJI_CATEGORIES[active_category],
+            key=emoji_key,
+            on_change=handle_emoji_pick,
+            args=(emoji_key,),
+            label_visibility="collapsed"
+        )
         
         # Selected emojis with auto-navigation
         if st.session_state.emoji_buffer:
             st.markdown("---")
-            st.markdown("**Your selected emojis:**")
+            # Typing in the compose form only reaches the server on submit, so the
+            # emojis are appended to the message there instead of into the draft
+            st.markdown("**Your selected emojis, added when you send:**")
             selected_text = " ".join(st.session_state.emoji_buffer)
-            st.markdown(f'''
-            <div style="
-                padding: 12px; 
-                background: {COLORS["background"]}; 
-                border-radius: 8px; 
-                text-align: center; 
-                font-size: 1.2em;
-                border: 1px solid {COLORS["border"]};
-                margin: 8px 0;
-            ">{selected_text}</div>
-            ''', unsafe_allow_html=True)
-            col1, col2 = st.columns(2)
-            if col1.button("Add to Message", use_container_width=True, key="add_emojis"):
-                if "message" in st.session_state.form:
-                    st.session_state.form["message"] += " " + " ".join(st.session_state.emoji_buffer)
-                st.session_state.emoji_buffer = []
-                st.session_state.current_tab = "✍️ Compose Message"
-                st.session_state.auto_scroll_to = "message-input"
-                st.rerun()
-            if col2.button("Clear Emojis", use_container_width=True, key="clear_emojis"):
-                st.session_state.emoji_buffer = []
-                st.rerun()
+            st.markdown(SELECTED_EMOJIS_TEMPLATE.format(selected_text=selected_text), unsafe_allow_html=True)
+            st.button(
+                "Clear Emojis",
+                use_container_width=True,
+                key="clear_emojis",
+                on_click=clear_emoji_buffer
+            )
+    
+    st.markdown("---")
+    
+    st.toggle("🎈 Celebrate sent messages", key="anim_enabled", help="Turn off for a lighter toast instead of balloons")
     
     st.markdown("---")
     
@@ -963,191 +1643,192 @@ with st.sidebar:
     with st.expander("🔐 Admin Access", expanded=False):
         if not st.session_state.admin_authenticated:
             st.markdown("**Administrative Controls**")
-            admin_input = st.text_input("Admin Password", type="password", key="admin_input")
+            st.text_input("Admin Password", type="password", key="admin_input")
+            st.button("Authenticate", use_container_width=True, on_click=authenticate_admin)
             
-            if st.button("Authenticate", use_container_width=True):
-                if admin_input and is_admin_key_valid(admin_input):
-                    st.session_state.admin_authenticated = True
-                    st.success("✅ Admin Authenticated")
-                    st.rerun()
-                else:
-                    st.error("❌ Invalid admin password")
+            if st.session_state.pop("admin_auth_failed", False):
+                st.error("❌ Invalid admin password")
         else:
             st.success("✅ Admin Authenticated")
             
+            stats = get_message_stats()
+            
+            st.markdown(
+                ADMIN_STATS_TEMPLATE.format(total=stats["total"], unique_senders=len(stats["senders"])),
+                unsafe_allow_html=True
+            )
+            
             messages = read_messages()
-            total_messages = len(messages)
+            st.download_button(
+                "📥 Export JSON",
+                data=encode_messages_json(messages),
+                file_name="messages.json",
+                mime="application/json",
+                use_container_width=True
+            )
+            # The PDF is only rendered once asked for, and again only after the board changes
+            if st.session_state.get("pdf_ready_for") == messages_fingerprint(messages):
+                st.download_button(
+                    "📄 Export PDF",
+                    data=get_pdf_bytes(messages),
+                    file_name="messages.pdf",
+                    mime="application/pdf",
+                    use_container_width=True
+                )
+            else:
+                st.button("📄 Prepare PDF", use_container_width=True, on_click=prepare_pdf_export)
             
-            st.markdown(f"""
-            <div style="background: {COLORS['background']}; padding: 1rem; border-radius: 8px; border: 1px solid {COLORS['border']}; margin-bottom: 1rem;">
-                <h4 style="margin: 0 0 0.5rem 0; color: {COLORS['text_primary']};">📊 Statistics</h4>
-                <div style="display: flex; justify-content: space-between;">
-                    <div>
-                        <div style="font-size: 0.8rem; color: {COLORS['text_secondary']};">Total Messages</div>
-                        <div style="font-size: 1.2rem; font-weight: bold; color: {COLORS['primary']};">{total_messages}</div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            # Recent messages are only rendered while the admin asks for them
+            if st.toggle("🗂️ Manage recent messages", key="admin_show_mgmt"):
+                recent = messages[-ADMIN_PREVIEW_COUNT:][::-1]
+                # The selection is held by row position, so it is only valid for the list it was made on
+                fingerprint = messages_fingerprint(messages)
+                if st.session_state.get("admin_recent_for") != fingerprint:
+                    st.session_state.pop("admin_recent", None)
+                    st.session_state.admin_recent_for = fingerprint
+                # One table element with row selection instead of a widget per message
+                selection = st.dataframe(
+                    [
+                        {
+                            "Name": m.get("name", "Anonymous"),
+                            "Message": str(m.get("message", ""))[:60],
+                            "Sent": m.get("timestamp", "")
+                        }
+                        for m in recent
+                    ],
+                    hide_index=True,
+                    use_container_width=True,
+                    key="admin_recent",
+                    on_select="rerun",
+                    selection_mode="multi-row"
+                ).selection
+                selected_ids = [
+                    recent[i].get("id") for i in selection.rows
+                    if i < len(recent) and recent[i].get("id")
+                ]
+                st.button(
+                    "🗑️ Delete selected",
+                    use_container_width=True,
+                    disabled=not selected_ids,
+                    on_click=delete_selected_messages,
+                    args=(selected_ids,)
+                )
             
-            if st.button("🚪 Logout Admin", use_container_width=True):
-                st.session_state.admin_authenticated = False
-                st.rerun()
+            st.button("🚪 Logout Admin", use_container_width=True, on_click=logout_admin)
 
-# Auto-scroll JavaScript injection
-if st.session_state.get('auto_scroll_to'):
-    scroll_target = st.session_state.auto_scroll_to
-    st.markdown(f"""
-    <script>
-    setTimeout(() => {{
-        scrollToElement('{scroll_target}', true);
-    }}, 800);
-    </script>
-    """, unsafe_allow_html=True)
-    # Reset the auto-scroll flag
-    st.session_state.auto_scroll_to = None
+# Navigation script, and the hook it watches for fields a callback asked to scroll to
+add_enhanced_navigation_js()
+add_scroll_request()
 
 # Main content area with proper IDs for scrolling
-if st.session_state.current_tab == "✍️ Compose Message":
+compose_tab, view_tab = st.tabs(["✍️ Compose Message", "📜 View Messages"])
+
+with compose_tab:
     # Compose Message Section
-    st.markdown(f"""
-    <div style="background: {COLORS['card_bg']}; padding: 2rem; border-radius: 16px; border: 1px solid {COLORS['border']};" class="mobile-padding" id="compose-section">
-        <h2 style="color: {COLORS['text_primary']}; margin-bottom: 1.5rem;">✨ Create Your Message</h2>
-    """, unsafe_allow_html=True)
+    st.markdown(COMPOSE_HEADER_HTML, unsafe_allow_html=True)
     
+    draft = st.session_state.form
     with st.form("compose_form", clear_on_submit=True):
-        name = st.text_input(
+        st.text_input(
             "**Your Name** ✏️",
             placeholder="Enter your name (or stay anonymous)",
-            value=st.session_state.form["name"],
+            value=draft["name"],
             max_chars=50,
             key="name_input"
         )
         
-        tone = st.selectbox(
+        st.selectbox(
             "**Message Tone** 🎭",
-            ["inspirational", "encouraging", "funny", "calm", "formal", "custom"],
-            index=["inspirational", "encouraging", "funny", "calm", "formal", "custom"].index(st.session_state.form.get("tone", "inspirational")),
+            TONES,
+            index=TONE_INDEX.get(draft.get("tone"), 0),
             key="tone_select"
         )
         
-        message = st.text_area(
+        st.text_area(
             "**Your Message** 💫",
             height=200,
             placeholder="Write your encouraging message here... (Markdown supported)",
-            value=st.session_state.form.get("message", ""),
             key="message_input"
         )
         
-        submitted = st.form_submit_button(
+        st.form_submit_button(
             " Send Your Wish",
-            use_container_width=True
+            use_container_width=True,
+            on_click=submit_message
         )
-        
-        if submitted:
-            if not message.strip():
-                st.error("Please write a message before sending!")
-            else:
-                final_message = message.strip()
-                
-                if st.session_state.emoji_buffer:
-                    final_message = final_message + " " + " ".join(st.session_state.emoji_buffer)
-                
-                entry = {
-                    "id": str(uuid.uuid4()),
-                    "name": (name.strip() or "Anonymous"),
-                    "recipient": get_recipient_string(),
-                    "message": final_message,
-                    "tone": tone,
-                    "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-                }
-                
-                append_message(entry)
-                st.session_state.emoji_buffer = []
-                st.session_state.form = {"name": "", "message": "", "tone": "inspirational"}
-                st.success("🎉 Your message was sent successfully!")
-                st.balloons()
-                st.session_state.current_tab = "📜 View Messages"
-                st.session_state.auto_scroll_to = "messages-section"
-                st.rerun()
-
-else:
-    # View Messages Section
+    
+    # Set by submit_message, which runs before this rerun reaches the form
+    submit_status = st.session_state.pop("submit_status", None)
+    if submit_status == "empty":
+        st.error("Please write a message before sending!")
+    elif submit_status == "sent":
+        st.success("🎉 Your message was sent successfully!")
+        if st.session_state.anim_enabled:
+            st.balloons()
+        else:
+            st.toast("🎉 Sent!")
+
+@st.fragment
+def render_message_list():
+    """Filter, stats and the current page of cards; filter and paging changes rerun only this"""
     messages = read_messages()
     
     if not messages:
-        st.markdown(f"""
-        <div style="text-align: center; padding: 4rem 2rem; background: {COLORS['card_bg']}; border-radius: 16px; border: 1px solid {COLORS['border']};" class="mobile-padding" id="messages-section">
-            <h3 style="color: {COLORS['text_secondary']}; margin-bottom: 1rem;">📝 No Messages Yet</h3>
-            <p style="color: {COLORS['text_secondary']}; font-size: 1.1rem;">Be the first to send some encouragement! 💫</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(EMPTY_STATE_HTML, unsafe_allow_html=True)
     else:
-        # Filters
+        # Filters (sender list, filtered messages and stats come from one pass)
+        sender_filter = st.session_state.get("sender_filter", "All")
+        senders, filtered, unique_senders = summarize_messages(messages, sender_filter)
         filter_col1, filter_col2 = st.columns([1, 1])
         with filter_col1:
-            senders = sorted({m.get("name", "Anonymous") for m in messages})
-            sender_filter = st.selectbox("Filter by sender", ["All"] + senders)
+            selected_sender = st.selectbox(
+                "Filter by sender",
+                ["All"] + senders,
+                key="sender_filter",
+                on_change=set_message_page,
+                args=(0,)
+            )
+        if selected_sender != sender_filter:
+            senders, filtered, unique_senders = summarize_messages(messages, selected_sender)
         
-        # Apply filters
-        filtered = messages
-        if sender_filter != "All":
-            filtered = [m for m in filtered if m.get("name") == sender_filter]
+        # Only the current page of cards is rendered
+        page_count = max(1, -(-len(filtered) // MESSAGES_PER_PAGE))
+        page = min(st.session_state.setdefault("page", 0), page_count - 1)
+        start = page * MESSAGES_PER_PAGE
+        shown = islice(reversed(filtered), start, start + MESSAGES_PER_PAGE)
         
-        # Statistics
-        st.markdown(f"""
-        <div style="background: {COLORS['card_bg']}; padding: 1rem; border-radius: 12px; margin: 1rem 0; border: 1px solid {COLORS['border']};" id="messages-section">
-            <div style="display: flex; justify-content: space-around; text-align: center;" class="mobile-stack">
-                <div class="mobile-margin">
-                    <div style="font-size: 0.9rem; color: {COLORS['text_secondary']};">Total Messages</div>
-                    <div style="font-size: 1.5rem; font-weight: bold; color: {COLORS['primary']};">{len(filtered)}</div>
-                </div>
-                <div class="mobile-margin">
-                    <div style="font-size: 0.9rem; color: {COLORS['text_secondary']};">Unique Senders</div>
-                    <div style="font-size: 1.5rem; font-weight: bold; color: {COLORS['secondary']};">{len({m.get('name', 'Anonymous') for m in filtered})}</div>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        # Statistics and message cards, sent to the browser as a single element
+        stats_html = VIEW_STATS_TEMPLATE.format(total=len(filtered), unique_senders=unique_senders)
+        st.markdown(stats_html + "".join(render_message_card(m) for m in shown), unsafe_allow_html=True)
         
-        # Message cards
-        for m in reversed(filtered):
-            name = m.get("name", "Anonymous")
-            tone = m.get("tone", "")
-            ts = m.get("timestamp", "")
-            msg_body = m.get("message", "")
-            
-            st.markdown(f"""
-            <div class="message-card mobile-padding">
-                <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 1rem;" class="mobile-stack">
-                    <div class="mobile-full-width mobile-margin">
-                        <div style="display: flex; align-items: center; gap: 0.5rem; flex-wrap: wrap;">
-                            <h4 style="margin: 0; color: {COLORS['text_primary']};">{name}</h4>
-                            {create_tone_badge(tone)}
-                        </div>
-                    </div>
-                    <div style="font-size: 0.8rem; color: {COLORS['text_secondary']};" class="mobile-full-width mobile-margin">{ts}</div>
-                </div>
-                <div style="
-                    padding: 1.5rem;
-                    background: {COLORS['background']};
-                    border-radius: 12px;
-                    border-left: 4px solid {COLORS['primary']};
-                    font-size: 1rem;
-                    line-height: 1.6;
-                    color: {COLORS['text_primary']};
-                    white-space: pre-wrap;
-                " class="mobile-padding">
-                    {msg_body}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        if page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            prev_col.button(
+                "← Newer",
+                key="page_prev",
+                disabled=page == 0,
+                use_container_width=True,
+                on_click=set_message_page,
+                args=(page - 1,)
+            )
+            page_col.markdown(
+                PAGE_INDICATOR_TEMPLATE.format(page=page + 1, page_count=page_count),
+                unsafe_allow_html=True
+            )
+            next_col.button(
+                "Older →",
+                key="page_next",
+                disabled=page >= page_count - 1,
+                use_container_width=True,
+                on_click=set_message_page,
+                args=(page + 1,)
+            )
+
+with view_tab:
+    # View Messages Section
+    st.button("🔄 Refresh Messages", key="refresh_messages", on_click=refresh_messages)
+    render_message_list()
 
 # Footer
 st.markdown("---")
-st.markdown(f"""
-<div style="text-align: center; color: {COLORS['text_secondary']}; padding: 2rem 0;">
-    <p>Made with ❤️ for spreading positivity and best wishes during exams</p>
-    <p style="font-size: 0.9rem;">📧 Messages: {len(read_messages())}</p>
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(FOOTER_TEMPLATE.format(count=get_message_stats()["total"]), unsafe_allow_html=True)
\ No newline at end of file
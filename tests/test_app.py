@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+
+def rerun(at):
+    """Run the app again, reporting unpicked emoji pills as empty selections"""
+    # AppTest cannot serialize a single-select st.pills whose value is None
+    for picker in at.get("button_group"):
+        if picker._value is None:
+            picker.set_value([])
+    return at.run()
+
+
+def start_app():
+    """Run the app as a fresh page load, with the process-wide stores rebuilt from disk"""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    at = AppTest.from_file(str(APP_PATH), default_timeout=30)
+    at.secrets["RECIPIENTS"] = "Sam"
+    return at.run()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # The local message log is written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def app(workdir):
+    return start_app()
+
+
+def send(at):
+    next(b for b in at.button if b.label.endswith("Send Your Wish")).click()
+    return rerun(at)
+
+
+def test_template_is_sent_as_the_message(app):
+    app.button(key="tmpl_Inspirational").click()
+    rerun(app)
+    send(app)
+    assert "Believe in yourself" in Path("messages.jsonl").read_text(encoding="utf-8")
+
+
+def test_picked_emojis_reach_the_sent_message(app):
+    app.get("button_group")[0].set_value(["🎉"])
+    rerun(app)
+    # A browser sends what was typed in the form only with the submit
+    app.text_area(key="message_input").input("My draft")
+    send(app)
+    assert "My draft 🎉" in Path("messages.jsonl").read_text(encoding="utf-8")
+
+
+def test_sending_switches_to_the_board(app):
+    app.text_area(key="message_input").input("Good luck")
+    send(app)
+    hooks = [m.value for m in app.markdown if "scroll-request" in m.value]
+    assert 'data-scroll-to="messages-section"' in hooks[0]
+
+
+def test_message_after_torn_line_survives_reload(workdir):
+    # A crash mid-append leaves the last line cut off, with no newline
+    (workdir / "messages.jsonl").write_bytes(b'{"id": "a1", "name": "Kim", "message": "Earlier"}\n{"id": "b2", "na')
+    app = start_app()
+    app.text_area(key="message_input").input("After the crash")
+    send(app)
+    
+    app = start_app()
+    board = "".join(m.value for m in app.markdown)
+    assert "Earlier" in board
+    assert "After the crash" in board